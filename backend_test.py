@@ -4,21 +4,85 @@ Backend API Testing Suite for Flux Productivity OS
 Tests all backend API endpoints for functionality and data persistence
 """
 
-import requests
+import atexit
+import httpx
+import orjson
+import re
 import json
 import sys
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
 # Use the public backend URL from frontend configuration
 BACKEND_URL = "https://fluxi-replication.preview.emergentagent.com/api"
 
+_STATUS_CLIENT_NAME = "FluxTestClient2024"
+_STATUS_PAYLOAD = orjson.dumps({"client_name": _STATUS_CLIENT_NAME})
+_REQUIRED_FIELDS = frozenset(("id", "client_name", "timestamp"))
+_UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.I)
+
+class _RetryTransport(httpx.BaseTransport):
+    """Retry transient gateway errors from the proxy in front of the backend"""
+    
+    def __init__(self, transport, retries=3, backoff_factor=0.1,
+                 status_forcelist=frozenset((502, 503, 504)),
+                 allowed_methods=frozenset(("GET", "POST"))):
+        self._transport = transport
+        self._retries = retries
+        self._backoff_factor = backoff_factor
+        self._status_forcelist = status_forcelist
+        self._allowed_methods = allowed_methods
+        
+    def handle_request(self, request):
+        response = self._transport.handle_request(request)
+        if request.method not in self._allowed_methods:
+            return response
+        for attempt in range(self._retries):
+            if response.status_code not in self._status_forcelist:
+                break
+            response.close()
+            time.sleep(self._backoff_factor * 2 ** attempt)
+            response = self._transport.handle_request(request)
+        return response
+        
+    def close(self):
+        self._transport.close()
+
+def _build_session():
+    """Build an HTTP/2 client shared by every BackendTester instance"""
+    # HTTP/2 multiplexes concurrent tests over one kept-alive TLS connection.
+    # The inner transport retries failed connects; the wrapper retries 502/503/504
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=16, max_connections=32)
+    )
+    return httpx.Client(
+        transport=_RetryTransport(transport),
+        headers={
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip'
+        },
+        follow_redirects=True,
+        timeout=10.0
+    )
+
+def _json(response):
+    """Decode a JSON response body with orjson"""
+    return orjson.loads(response.content)
+
+_SESSION = _build_session()
+atexit.register(_SESSION.close)
+
 class BackendTester:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json'
-        })
+        self.session = _SESSION
         self.test_results = []
+        # Results record monotonic offsets from these; ISO strings are built only when printed
+        self._t0_wall = datetime.now()
+        self._t0_mono = time.monotonic_ns()
         
     def log_result(self, test_name, success, details=""):
         """Log test results for reporting"""
@@ -28,18 +92,21 @@ class BackendTester:
             'status': status,
             'success': success,
             'details': details,
-            'timestamp': datetime.now().isoformat()
+            'ts_ns': time.monotonic_ns() - self._t0_mono
         }
         self.test_results.append(result)
         print(f"{status} {test_name}: {details}")
         
-    def test_root_endpoint(self):
-        """Test GET /api/ endpoint"""
+    def test_root_endpoint(self, pending=None):
+        """Test GET /api/ endpoint, optionally using an already-submitted request future"""
         try:
-            response = self.session.get(f"{BACKEND_URL}/")
+            if pending is not None:
+                response = pending.result()
+            else:
+                response = self.session.get(f"{BACKEND_URL}/")
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
                 if data.get("message") == "Hello World":
                     self.log_result("Root Endpoint", True, "Returns correct message")
                     return True
@@ -57,35 +124,32 @@ class BackendTester:
     def test_create_status_check(self):
         """Test POST /api/status endpoint"""
         try:
-            test_payload = {
-                "client_name": "FluxTestClient2024"
-            }
-            
+            # Send the pre-serialized payload; Content-Type is set on the shared client
             response = self.session.post(
                 f"{BACKEND_URL}/status",
-                json=test_payload
+                content=_STATUS_PAYLOAD
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
+                
+                if not isinstance(data, dict):
+                    self.log_result("Create Status Check", False, "Response is not an object")
+                    return False, None
                 
                 # Validate response structure
-                required_fields = ["id", "client_name", "timestamp"]
-                missing_fields = [field for field in required_fields if field not in data]
+                missing_fields = _REQUIRED_FIELDS - data.keys()
                 
                 if missing_fields:
-                    self.log_result("Create Status Check", False, f"Missing fields: {missing_fields}")
+                    self.log_result("Create Status Check", False, f"Missing fields: {sorted(missing_fields)}")
                     return False, None
                 
-                if data["client_name"] != test_payload["client_name"]:
+                if data["client_name"] != _STATUS_CLIENT_NAME:
                     self.log_result("Create Status Check", False, "Client name mismatch")
                     return False, None
                     
                 # Validate UUID format
-                try:
-                    import uuid
-                    uuid.UUID(data["id"])
-                except ValueError:
+                if not isinstance(data["id"], str) or not _UUID_RE.fullmatch(data["id"]):
                     self.log_result("Create Status Check", False, "Invalid UUID format")
                     return False, None
                 
@@ -106,7 +170,7 @@ class BackendTester:
             response = self.session.get(f"{BACKEND_URL}/status")
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
                 
                 if not isinstance(data, list):
                     self.log_result("Get Status Checks", False, "Response is not a list")
@@ -119,10 +183,9 @@ class BackendTester:
                         if item.get("id") == expected_id:
                             found_entry = True
                             # Validate structure of found entry
-                            required_fields = ["id", "client_name", "timestamp"]
-                            missing_fields = [field for field in required_fields if field not in item]
+                            missing_fields = _REQUIRED_FIELDS - item.keys()
                             if missing_fields:
-                                self.log_result("Get Status Checks", False, f"Entry missing fields: {missing_fields}")
+                                self.log_result("Get Status Checks", False, f"Entry missing fields: {sorted(missing_fields)}")
                                 return False
                             break
                     
@@ -141,13 +204,14 @@ class BackendTester:
             self.log_result("Get Status Checks", False, f"Request failed: {str(e)}")
             return False
     
-    def test_data_persistence(self):
+    def test_data_persistence(self, created_id=None):
         """Test that data persists between requests"""
         try:
-            # Create a status check
-            create_success, created_id = self.test_create_status_check()
-            if not create_success:
-                return False
+            # Create a status check unless one was already created by the caller
+            if created_id is None:
+                create_success, created_id = self.test_create_status_check()
+                if not create_success:
+                    return False
             
             # Retrieve all status checks and verify our entry exists
             get_success = self.test_get_status_checks(created_id)
@@ -167,17 +231,24 @@ class BackendTester:
         print(f"Backend URL: {BACKEND_URL}")
         print("=" * 60)
         
-        # Test 1: Root endpoint
-        root_success = self.test_root_endpoint()
-        
-        # Test 2: Create status check
-        create_success, created_id = self.test_create_status_check()
-        
-        # Test 3: Get status checks
-        get_success = self.test_get_status_checks()
-        
-        # Test 4: Data persistence (combined test)
-        persistence_success = self.test_data_persistence()
+        # The root request is independent, so send it alongside the create/get chain;
+        # both share the client's HTTP/2 connection as separate streams. Its result is
+        # logged from this thread afterwards so the report order stays fixed
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            root_pending = executor.submit(self.session.get, f"{BACKEND_URL}/")
+            
+            # Test 1: Create status check
+            create_success, created_id = self.test_create_status_check()
+            
+            if create_success:
+                # Tests 2 & 3: Get status checks and data persistence, reusing the created ID
+                self.test_data_persistence(created_id)
+            else:
+                # Test 2: Get status checks
+                self.test_get_status_checks()
+            
+            # Test 4: Root endpoint
+            self.test_root_endpoint(root_pending)
         
         # Summary
         print("=" * 60)
@@ -195,7 +266,8 @@ class BackendTester:
             print("\n❌ FAILED TESTS:")
             for result in self.test_results:
                 if not result['success']:
-                    print(f"  - {result['test']}: {result['details']}")
+                    iso = (self._t0_wall + timedelta(microseconds=result['ts_ns'] // 1000)).isoformat()
+                    print(f"  - [{iso}] {result['test']}: {result['details']}")
         
         overall_success = failed_tests == 0
         status = "✅ ALL TESTS PASSED" if overall_success else "❌ SOME TESTS FAILED"